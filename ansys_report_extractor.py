@@ -1,13 +1,26 @@
 import os
 import re
+import ast
+import hashlib
+import tempfile
+import time
+import email.utils
 import pandas as pd
 import json
-import requests
-import numpy as np
-import pdfplumber  # Added for PDF processing
-from typing import Dict, List, Union, Optional, Any
+try:
+    import orjson  # Optional: faster and more precise JSON parsing
+except ImportError:
+    orjson = None
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union, Optional, Any
+from pathlib import Path
 import logging
 import argparse
+import asyncio
+import importlib.util
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    import httpx
 
 # Configure logging
 logging.basicConfig(
@@ -17,8 +30,250 @@ logging.basicConfig(
 )
 logger = logging.getLogger('ANSYS_Report_Extractor')
 
+# Maximum number of OpenRouter requests in flight at once
+API_MAX_WORKERS = 8
+
+# Maximum number of concurrent OpenRouter connections when using asyncio
+ASYNC_MAX_CONNECTIONS = 64
+
+# (connect, read) timeout in seconds for OpenRouter requests
+API_TIMEOUT = (10, 120)
+
+# Retry policy for rate-limited and transient server errors
+API_MAX_RETRIES = 3
+API_RETRY_BACKOFF = 0.5
+API_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Output token budget per report and the model's output limit per request
+# (claude-3-opus replies are capped at 4096 tokens)
+API_TOKENS_PER_REPORT = 1000
+API_MAX_OUTPUT_TOKENS = 4096
+
+# Number of reports sent to the API in a single request; bounded so that a batch
+# reply fits in the model's output limit
+API_MAX_BATCH_SIZE = API_MAX_OUTPUT_TOKENS // API_TOKENS_PER_REPORT
+API_BATCH_SIZE = API_MAX_BATCH_SIZE
+
+# Number of report characters sent to the API (and therefore worth reading from the PDF)
+MAX_REPORT_CHARS = 4000
+
+# Fallback for Min/Max Deformation strings that are not valid Python literals, e.g. "[0.0, 0.00637] m"
+_DEFORM_RE = re.compile(r'\[\s*([^,\]]+)\s*,\s*([^,\]]+)\s*\]')
+
+# Parameters and formatting rules shared by the single-report and batch prompts
+_EXTRACTION_INSTRUCTIONS = """
+Extract values for:
+Bridge Length (m), Bridge Width (m), Bridge Height (m), Cross-Sectional Diameter (m), Cross-Sectional Area (m²), 
+Cross-Sectional Moment of Inertia (m⁴), Number of Strands, Number of Beams, Angle of Inclination (°), 
+Angle of Declination (°), Young's Modulus (Pa), Poisson's Ratio, Density (kg/m³), Tensile Yield Strength (Pa), 
+Shear Modulus (Pa), Applied Force (N), Mesh Elements, Mesh Density (elements/m³), Max Equivalent Stress (Pa), 
+Max Principal Stress (Pa), Min/Max Deformation (m), Safety Factor, Reaction Forces (N), Strain Energy (J), 
+Work Done (J).
+
+Formatting Rules:
+- Return the results as a JSON object with parameter names as keys and values as floating-point numbers or strings.
+- Use scientific notation when appropriate (e.g., 1.017e-9).
+- Mark missing data as null.
+- Apply these manual overrides:
+    - Number of Strands = 6
+    - Number of Beams = 2
+    - Angle of Inclination/Declination = 0
+- Format Reaction Forces as a nested array, e.g., [[0,850,0],[0,850,0]].
+"""
+
+# Prompt sent to the API; {report} is the (truncated) report text
+_PROMPT_TEMPLATE = """
+Task: Extract specific engineering parameters from the following ANSYS report and format them into values only.
+""" + _EXTRACTION_INSTRUCTIONS + """
+ANSYS REPORT (extracted from PDF):
+{report}
+
+Output JSON format only, no explanations or additional text:
+"""
+
+# Prompt for several reports in one request; {reports} holds the reports, each
+# preceded by a ===REPORT <id>=== separator line
+_BATCH_PROMPT_TEMPLATE = """
+Task: Extract specific engineering parameters from each of the following ANSYS reports and format them into values only.
+""" + _EXTRACTION_INSTRUCTIONS + """- Return one JSON object per report, wrapped as
+  {{"reports": [{{"id": <report id>, "params": <JSON object for that report>}}, ...]}}
+  with exactly one entry for every report below.
+
+ANSYS REPORTS (extracted from PDF, each preceded by a ===REPORT <id>=== line):
+{reports}
+
+Output JSON format only, no explanations or additional text:
+"""
+
+# Strips markdown code fences the model sometimes wraps its JSON answer in
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available, falling back to the standard library."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize an object to UTF-8 JSON with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _init_worker():
+    """
+    One-time setup for each process-pool worker.
+
+    Silences MuPDF's own error printing for the lifetime of the worker instead of
+    paying for it on every document; failures still raise and are logged by
+    read_report_file.
+    """
+    import fitz  # PyMuPDF
+
+    fitz.TOOLS.mupdf_display_errors(False)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date.
+
+    Args:
+        value: Header value, or None if the header is absent
+
+    Returns:
+        Number of seconds to wait, or None if the header is absent or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _process_one(file_path: str, max_chars: Optional[int] = MAX_REPORT_CHARS) -> str:
+    """
+    Worker entry point for the process pool: read a single report PDF.
+
+    Defined at module level so it can be pickled and sent to worker processes.
+
+    Args:
+        file_path: Path to the ANSYS report PDF file
+        max_chars: Stop reading pages once this many characters have been extracted
+
+    Returns:
+        Content of the file as a string
+    """
+    return ANSYSReportExtractor.read_report_file(file_path, max_chars)
+
+
+def _to_float(value: Any) -> float:
+    """
+    Convert a parameter value from the model to a float.
+
+    Args:
+        value: Parameter value of any type
+
+    Returns:
+        The value as a float, or NaN if it is missing or not a number
+    """
+    try:
+        return float(value)
+    except Exception:
+        return float('nan')
+
+
+def _extract_max_deformation(deformation: Any) -> float:
+    """
+    Get the absolute maximum deformation from a Min/Max Deformation value.
+
+    Args:
+        deformation: [min, max] pair as a list or its string representation
+
+    Returns:
+        Absolute maximum deformation, or NaN if the value is missing or cannot be parsed
+    """
+    if isinstance(deformation, str):
+        try:
+            deformation = ast.literal_eval(deformation.strip())
+        except Exception:
+            # The string comes from the model; literal_eval can also fail with
+            # TypeError (e.g. unhashable set members) or RecursionError
+            match = _DEFORM_RE.search(deformation)
+            if not match:
+                return float('nan')
+            deformation = match.groups()
+    try:
+        return abs(float(deformation[1]))
+    except Exception:
+        return float('nan')
+
+
+def _excel_value(value: Any) -> Any:
+    """
+    Convert a DataFrame cell to a value openpyxl can write, as pandas' to_excel does.
+
+    Args:
+        value: Cell value from the DataFrame
+
+    Returns:
+        None for missing values, a string for containers, otherwise the value itself
+    """
+    if isinstance(value, (list, tuple, dict)):
+        return str(value)
+    if pd.isna(value):
+        return None
+    return value
+
+
 class ANSYSReportExtractor:
-    def __init__(self, api_key: str, excel_template_path: str, reports_dir: str, output_path: str):
+    # Map of parameter names to column names
+    _PARAM_TO_COLUMN = {
+        'Bridge Length (m)': 'Bridge Length (m)',
+        'Bridge Width (m)': 'Bridge Width (m)',
+        'Bridge Height (m)': 'Bridge Height (m)',
+        'Cross-Sectional Diameter (m)': 'Cross-Sectional Diameter (m)',
+        'Cross-Sectional Area (m²)': 'Cross-Sectional Area (m²)',
+        'Cross-Sectional Moment of Inertia (m⁴)': 'Cross-Sectional Moment of Inertia (m⁴)',
+        'Number of Strands': 'Number of Strands',
+        'Number of Beams': 'Number of Beams',
+        'Angle of Inclination (°)': 'Angle of Inclination (°)',
+        'Angle of Declination (°)': 'Angle of Declination (°)',
+        'Young\'s Modulus (Pa)': 'Young\'s Modulus (Pa)',
+        'Poisson\'s Ratio': 'Poisson\'s Ratio',
+        'Density (kg/m³)': 'Density (kg/m³)',
+        'Tensile Yield Strength (Pa)': 'Tensile Yield Strength (Pa)',
+        'Shear Modulus (Pa)': 'Shear Modulus (Pa)',
+        'Applied Force (N)': 'Applied Force (N)',
+        'Mesh Elements': 'Mesh Elements',
+        'Mesh Density (elements/m³)': 'Mesh Density (elements/m³)',
+        'Max Equivalent Stress (Pa)': 'Max Equivalent Stress (Pa)',
+        'Max Principal Stress (Pa)': 'Max Principal Stress (Pa)',
+        'Min/Max Deformation (m)': 'Min/Max Deformation (m)',
+        'Safety Factor': 'Safety Factor',
+        'Reaction Forces (N)': 'Reaction Forces (N)',
+        'Strain Energy (J)': 'Strain Energy (J)',
+        'Work Done (J)': 'Work Done (J)',
+        'Energy Residual (J)': 'Energy Residual (J)',
+        'Yield Constraint Residual': 'Yield Constraint Residual',
+        'Max Failure Load (kg)': 'Max Failure Load (N)'  # Note: Despite column name confusion, this is kg
+    }
+    
+    # Columns holding a handful of repeated labels, stored as pandas categoricals
+    _CATEGORICAL_COLUMNS = ('Bridge Type', 'Joint Design', 'Load Type', 'Support Type')
+    
+    def __init__(self, api_key: str, excel_template_path: str, reports_dir: str, output_path: str,
+                 num_workers: Optional[int] = None, batch_size: int = API_BATCH_SIZE):
         """
         Initialize the ANSYS Report Extractor with required parameters.
         
@@ -27,24 +282,80 @@ class ANSYSReportExtractor:
             excel_template_path: Path to the Excel template file
             reports_dir: Directory containing ANSYS reports
             output_path: Path where the populated Excel file will be saved
+            num_workers: Number of worker processes used to read PDF files
+                (defaults to min(cpu_count, 4))
+            batch_size: Number of reports sent to the API per request
+                (at most API_MAX_BATCH_SIZE)
         """
         self.api_key = api_key
         self.excel_template_path = excel_template_path
         self.reports_dir = reports_dir
         self.output_path = output_path
+        self.num_workers = num_workers or min(os.cpu_count() or 1, 4)
+        if batch_size > API_MAX_BATCH_SIZE:
+            logger.warning(f"Batch size {batch_size} would not fit in the model's output limit, "
+                           f"using {API_MAX_BATCH_SIZE}")
+        self.batch_size = min(max(1, batch_size), API_MAX_BATCH_SIZE)
         self.df = None
+        # Rows added since the last save; concatenated onto self.df once in save_excel
+        self._pending_rows: List[Dict[str, Any]] = []
+        
+        # API responses are cached on disk, keyed by the report text sent in the prompt
+        self._cache_dir = Path(output_path).parent / ".llm_cache"
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # The HTTP stack is imported where it is used so that `--help` does not load it
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+        
+        # Reuse pooled HTTPS connections across API calls (and threads), retrying
+        # connection failures and rate-limited or transient server errors with
+        # exponential backoff. POST is not retried by default, so it is allowed
+        # explicitly; read errors and timeouts are not retried, since the paid,
+        # non-idempotent completion may already be running and a retry would
+        # multiply the read timeout.
+        retry = Retry(total=API_MAX_RETRIES, read=0, other=0, backoff_factor=API_RETRY_BACKOFF,
+                      status_forcelist=API_RETRY_STATUSES, allowed_methods=frozenset(['POST']))
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry))
         
         # Load the Excel template
         self.load_excel_template()
     
     def load_excel_template(self):
-        """Load the Excel template file into a pandas DataFrame."""
+        """
+        Load the Excel template file into a pandas DataFrame.
+        
+        The parsed template is cached in a Parquet file next to it and reused
+        for as long as the template is not modified.
+        """
+        cache_path = self.excel_template_path + '.parquet'
+        try:
+            if (os.path.exists(cache_path)
+                    and os.path.getmtime(cache_path) >= os.path.getmtime(self.excel_template_path)):
+                self.df = pd.read_parquet(cache_path)
+                logger.info(f"Successfully loaded Excel template from cache {cache_path}")
+                return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable template cache {cache_path}: {e}")
+        
         try:
             self.df = pd.read_excel(self.excel_template_path)
             logger.info(f"Successfully loaded Excel template from {self.excel_template_path}")
         except Exception as e:
             logger.error(f"Failed to load Excel template: {e}")
             raise
+        
+        # pyarrow is optional; without it the template is simply parsed from Excel each run
+        if importlib.util.find_spec('pyarrow') is None:
+            return
+        try:
+            self.df.to_parquet(cache_path, index=False)
+        except Exception as e:
+            # Expected for templates mixing numbers and 'N/A' in a column (e.g. earlier
+            # outputs of this tool); it only costs a slower load next time
+            logger.debug(f"Could not cache Excel template to {cache_path}: {e}")
     
     def find_ansys_reports(self) -> List[str]:
         """
@@ -53,34 +364,40 @@ class ANSYSReportExtractor:
         Returns:
             List of paths to ANSYS report PDF files.
         """
-        report_files = []
-        
-        for root, _, files in os.walk(self.reports_dir):
-            for file in files:
-                # Looking specifically for PDF files that might be ANSYS reports
-                if file.endswith('.pdf'):
-                    report_files.append(os.path.join(root, file))
+        # Looking specifically for PDF files that might be ANSYS reports; sorted so
+        # Bridge IDs are assigned in a stable order across runs
+        report_files = sorted(str(path) for path in Path(self.reports_dir).rglob('*.pdf'))
         
         logger.info(f"Found {len(report_files)} ANSYS PDF report files")
         return report_files
     
-    def read_report_file(self, file_path: str) -> str:
+    @staticmethod
+    def read_report_file(file_path: str, max_chars: Optional[int] = MAX_REPORT_CHARS) -> str:
         """
         Read the content of an ANSYS report PDF file.
         
         Args:
             file_path: Path to the ANSYS report PDF file
+            max_chars: Stop reading pages once this many characters have been
+                extracted (None reads the whole document)
             
         Returns:
             Content of the file as a string
         """
+        import fitz  # PyMuPDF
+        
         try:
-            text_content = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    extracted_text = page.extract_text()
-                    if extracted_text:
-                        text_content += extracted_text + "\n"
+            pages = []
+            text_length = 0
+            with fitz.open(file_path) as doc:
+                for page_number in range(doc.page_count):
+                    page_text = doc.load_page(page_number).get_text("text")
+                    pages.append(page_text)
+                    text_length += len(page_text) + 1
+                    # Only the start of the report is sent to the API
+                    if max_chars is not None and text_length >= max_chars:
+                        break
+            text_content = "\n".join(pages)
             
             logger.info(f"Successfully extracted text from PDF file: {file_path}")
             return text_content
@@ -98,127 +415,414 @@ class ANSYSReportExtractor:
         Returns:
             Dictionary of extracted parameters
         """
-        # Prepare the prompt for the API
-        prompt = f"""
-        Task: Extract specific engineering parameters from the following ANSYS report and format them into values only.
-
-        Extract values for:
-        Bridge Length (m), Bridge Width (m), Bridge Height (m), Cross-Sectional Diameter (m), Cross-Sectional Area (m²), 
-        Cross-Sectional Moment of Inertia (m⁴), Number of Strands, Number of Beams, Angle of Inclination (°), 
-        Angle of Declination (°), Young's Modulus (Pa), Poisson's Ratio, Density (kg/m³), Tensile Yield Strength (Pa), 
-        Shear Modulus (Pa), Applied Force (N), Mesh Elements, Mesh Density (elements/m³), Max Equivalent Stress (Pa), 
-        Max Principal Stress (Pa), Min/Max Deformation (m), Safety Factor, Reaction Forces (N), Strain Energy (J), 
-        Work Done (J).
-
-        Formatting Rules:
-        - Return the results as a JSON object with parameter names as keys and values as floating-point numbers or strings.
-        - Use scientific notation when appropriate (e.g., 1.017e-9).
-        - Mark missing data as null.
-        - Apply these manual overrides:
-            - Number of Strands = 6
-            - Number of Beams = 2
-            - Angle of Inclination/Declination = 0
-        - Format Reaction Forces as a nested array, e.g., [[0,850,0],[0,850,0]].
-
-        ANSYS REPORT (extracted from PDF):
-        {report_content[:4000]}  # Truncate to avoid token limits
-
-        Output JSON format only, no explanations or additional text:
-        """
+        # Reports that were already sent to the API are answered from the cache
+        cache_key, cached_params = self._lookup_cached_parameters(report_content)
+        if cached_params is not None:
+            return cached_params
+        
+        # Prepare the prompt for the API (truncated to avoid token limits)
+        prompt = _PROMPT_TEMPLATE.format(report=report_content[:MAX_REPORT_CHARS])
         
         # Call the OpenRouter API to extract parameters
         try:
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "anthropic/claude-3-opus", # Using a capable model for technical extraction
-                    "messages": [{"role": "user", "content": prompt}]
-                }
-            )
+            return self._accept_parameters(cache_key, _json_loads(self._call_api(prompt)))
+        except Exception as e:
+            logger.error(f"Error calling OpenRouter API: {e}")
+            raise
+    
+    async def extract_parameters_async(self, client: "httpx.AsyncClient", report_content: str) -> Dict[str, Any]:
+        """
+        Extract relevant parameters from the ANSYS report with an asynchronous API call.
+        
+        Args:
+            client: Shared httpx client used for the request
+            report_content: Content of the ANSYS report
             
-            # Check for successful response
-            response.raise_for_status()
-            result = response.json()
+        Returns:
+            Dictionary of extracted parameters
+        """
+        # Reports that were already sent to the API are answered from the cache
+        cache_key, cached_params = self._lookup_cached_parameters(report_content)
+        if cached_params is not None:
+            return cached_params
+        
+        # Prepare the prompt for the API (truncated to avoid token limits)
+        prompt = _PROMPT_TEMPLATE.format(report=report_content[:MAX_REPORT_CHARS])
+        
+        try:
+            return self._accept_parameters(cache_key, _json_loads(await self._call_api_async(client, prompt)))
+        except Exception as e:
+            logger.error(f"Error calling OpenRouter API: {e}")
+            raise
+    
+    def _lookup_cached_parameters(self, report_content: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Look up a report's parameters in the response cache.
+        
+        Args:
+            report_content: Content of the ANSYS report
             
-            # Extract the JSON from the response
-            extracted_text = result['choices'][0]['message']['content']
+        Returns:
+            The report's cache key, and its parameters with the manual overrides
+            applied, or None on a cache miss
+        """
+        cache_key = self._cache_key(report_content)
+        cached_params = self._load_cached_parameters(cache_key)
+        if cached_params is None:
+            return cache_key, None
+        logger.info("Loaded extracted parameters from cache")
+        return cache_key, self._apply_manual_overrides(cached_params)
+    
+    def _accept_parameters(self, cache_key: str, extracted_params: Any) -> Dict[str, Any]:
+        """
+        Validate parameters parsed from an API reply, cache them and apply the manual overrides.
+        
+        Args:
+            cache_key: Cache key of the report the parameters belong to
+            extracted_params: Parsed JSON value returned by the model
             
-            # Sometimes the API might return the JSON with markdown code block formatting
-            # We need to clean this up
-            json_pattern = r'```(?:json)?\s*(.*?)```'
-            json_match = re.search(json_pattern, extracted_text, re.DOTALL)
+        Returns:
+            Dictionary of extracted parameters
+        """
+        # Anything but a JSON object is rejected before it can be cached
+        if not isinstance(extracted_params, dict):
+            raise ValueError(f"expected a JSON object of parameters, got {type(extracted_params).__name__}")
+        logger.info("Successfully extracted parameters from report")
+        
+        self._store_cached_parameters(cache_key, extracted_params)
+        
+        return self._apply_manual_overrides(extracted_params)
+    
+    def extract_parameters_batch(self, reports: List[Tuple[int, str]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Extract parameters from several ANSYS reports with a single API request.
+        
+        Reports found in the cache are not sent. If the batch response cannot be
+        parsed or matched to the reports, the affected reports fall back to one
+        request each. A failed request (timeout, connection error, exhausted retries)
+        is not retried per report; the reports it covered are left out.
+        
+        Args:
+            reports: List of (report id, report content) pairs
             
-            if json_match:
-                extracted_text = json_match.group(1).strip()
+        Returns:
+            Dictionary mapping report id to its extracted parameters; reports whose
+            extraction failed are left out
+        """
+        import requests
+        
+        results = {}
+        pending = []
+        for report_id, report_content in reports:
+            cache_key, cached_params = self._lookup_cached_parameters(report_content)
+            if cached_params is not None:
+                results[report_id] = cached_params
+            else:
+                pending.append((report_id, report_content, cache_key))
+        
+        if len(pending) > 1:
+            logger.info(f"Extracting parameters from {len(pending)} reports in one request")
+            report_sections = "\n".join(
+                f"===REPORT {report_id}===\n{report_content[:MAX_REPORT_CHARS]}"
+                for report_id, report_content, _ in pending
+            )
+            try:
+                response = _json_loads(self._call_api(_BATCH_PROMPT_TEMPLATE.format(reports=report_sections),
+                                                      max_tokens=len(pending) * API_TOKENS_PER_REPORT))
+                entries = response['reports']
+                if not isinstance(entries, list):
+                    raise ValueError("'reports' is not a list")
+            except requests.RequestException as e:
+                # Transport failures (timeouts, connection errors, exhausted retries on
+                # 429/5xx) fail the whole batch; retrying each report separately would
+                # only add load. The reports are picked up again on the next run.
+                logger.error(f"Batch request failed for {len(pending)} reports: {e}")
+                return results
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                logger.warning(f"Batch response could not be parsed, falling back to one request per report: {e}")
+                entries = []
             
-            # Parse the JSON data
-            extracted_params = json.loads(extracted_text)
-            logger.info("Successfully extracted parameters from report")
+            # Entries are matched one by one so a single malformed entry only costs
+            # that report a separate request
+            batch_params = {}
+            for entry in entries:
+                try:
+                    batch_params[int(entry['id'])] = entry['params']
+                except (TypeError, ValueError, KeyError) as e:
+                    logger.warning(f"Skipping malformed entry in batch response: {e!r}")
             
-            # Apply manual overrides
-            extracted_params['Number of Strands'] = 6
-            extracted_params['Number of Beams'] = 2
-            extracted_params['Angle of Inclination (°)'] = 0
-            extracted_params['Angle of Declination (°)'] = 0
+            unmatched = []
+            for report_id, report_content, cache_key in pending:
+                params = batch_params.get(report_id)
+                if isinstance(params, dict):
+                    results[report_id] = self._accept_parameters(cache_key, params)
+                else:
+                    unmatched.append((report_id, report_content, cache_key))
+            pending = unmatched
+        
+        # Single-report mode for anything the batch request did not cover
+        for report_id, report_content, _ in pending:
+            try:
+                results[report_id] = self.extract_parameters(report_content)
+            except requests.RequestException:
+                # extract_parameters has already logged the error; stop sending requests
+                # for this batch while the API is unreachable or rate limiting
+                break
+            except Exception:
+                # extract_parameters has already logged the error
+                continue
+        
+        return results
+    
+    def _call_api(self, prompt: str, max_tokens: int = API_TOKENS_PER_REPORT) -> str:
+        """
+        Send a prompt to the OpenRouter API.
+        
+        Args:
+            prompt: Prompt for the model
+            max_tokens: Maximum number of tokens in the model's reply
             
-            return extracted_params
+        Returns:
+            Text of the model's reply with any markdown code fences removed
+        """
+        response = self.session.post(OPENROUTER_URL, timeout=API_TIMEOUT, **self._request_kwargs(prompt, max_tokens))
+        
+        # Check for successful response
+        response.raise_for_status()
+        return self._parse_completion(response.content)
+    
+    async def _call_api_async(self, client: "httpx.AsyncClient", prompt: str,
+                              max_tokens: int = API_TOKENS_PER_REPORT) -> str:
+        """
+        Send a prompt to the OpenRouter API without blocking the event loop.
+        
+        Follows the synchronous session's retry policy: connection failures and
+        rate-limited or transient server errors are retried with exponential
+        backoff (or after the server's Retry-After delay), while read errors and
+        timeouts are not retried.
+        
+        Args:
+            client: Shared httpx client used for the request
+            prompt: Prompt for the model
+            max_tokens: Maximum number of tokens in the model's reply
             
+        Returns:
+            Text of the model's reply with any markdown code fences removed
+        """
+        import httpx
+        
+        for attempt in range(API_MAX_RETRIES + 1):
+            try:
+                response = await client.post(OPENROUTER_URL, **self._request_kwargs(prompt, max_tokens))
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # The request never reached the server, so it is safe to send again
+                if attempt == API_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(API_RETRY_BACKOFF * 2 ** attempt)
+                continue
+            if response.status_code not in API_RETRY_STATUSES or attempt == API_MAX_RETRIES:
+                break
+            retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+            await asyncio.sleep(retry_after if retry_after is not None else API_RETRY_BACKOFF * 2 ** attempt)
+        
+        # Check for successful response
+        response.raise_for_status()
+        return self._parse_completion(response.content)
+    
+    def _request_kwargs(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        """Headers and JSON body of an OpenRouter chat completion request."""
+        return {
+            "headers": {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            "json": {
+                "model": "anthropic/claude-3-opus", # Using a capable model for technical extraction
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": max_tokens
+            }
+        }
+    
+    @staticmethod
+    def _parse_completion(body: bytes) -> str:
+        """
+        Get the model's reply from an OpenRouter response body.
+        
+        Args:
+            body: Raw JSON body of the API response
+            
+        Returns:
+            Text of the model's reply with any markdown code fences removed
+        """
+        result = _json_loads(body)
+        
+        # Extract the JSON from the response; a reply cut off at max_tokens is not valid JSON
+        choice = result['choices'][0]
+        if choice.get('finish_reason') == 'length':
+            raise ValueError("model reply was truncated at max_tokens")
+        extracted_text = choice['message']['content']
+        
+        # Sometimes the API might return the JSON with markdown code block formatting
+        # We need to clean this up; a plain JSON reply skips the regex entirely
+        if '```' in extracted_text:
+            json_match = _JSON_BLOCK_RE.search(extracted_text)
+            if json_match:
+                extracted_text = json_match.group(1)
+        
+        return extracted_text.strip()
+    
+    @staticmethod
+    def _cache_key(report_content: str) -> str:
+        """Cache key for a report: SHA-256 of the report text sent to the API."""
+        return hashlib.sha256(report_content[:MAX_REPORT_CHARS].encode()).hexdigest()
+    
+    @staticmethod
+    def _apply_manual_overrides(params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply the fixed parameter values shared by every bridge.
+        
+        Args:
+            params: Dictionary of extracted parameters
+            
+        Returns:
+            The same dictionary with the manual overrides applied
+        """
+        params['Number of Strands'] = 6
+        params['Number of Beams'] = 2
+        params['Angle of Inclination (°)'] = 0
+        params['Angle of Declination (°)'] = 0
+        return params
+    
+    def _load_cached_parameters(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load previously extracted parameters from the response cache.
+        
+        Args:
+            cache_key: SHA-256 hex digest of the report text sent to the API
+            
+        Returns:
+            Dictionary of extracted parameters, or None on a cache miss
+        """
+        cache_file = self._cache_dir / f"{cache_key}.json"
+        if not cache_file.exists():
+            return None
+        try:
+            cached_params = _json_loads(cache_file.read_bytes())
         except Exception as e:
-            logger.error(f"Error calling OpenRouter API: {e}")
-            raise
+            logger.warning(f"Ignoring unreadable cache file {cache_file}: {e}")
+            return None
+        if not isinstance(cached_params, dict):
+            logger.warning(f"Ignoring malformed cache file {cache_file}")
+            return None
+        return cached_params
     
-    def calculate_derived_parameters(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _store_cached_parameters(self, cache_key: str, params: Dict[str, Any]):
         """
-        Calculate derived parameters based on extracted values.
+        Atomically write extracted parameters to the response cache.
         
         Args:
+            cache_key: SHA-256 hex digest of the report text sent to the API
             params: Dictionary of extracted parameters
+        """
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(_json_dumps(params))
+                os.replace(tmp_path, self._cache_dir / f"{cache_key}.json")
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except Exception as e:
+            # A failed cache write only costs a future API call
+            logger.warning(f"Failed to write cache entry {cache_key}: {e}")
+    
+    def _read_and_extract_batch(self, read_futures: List[Tuple[int, Future]]) -> Dict[int, Any]:
+        """
+        Wait for a batch of reports to be read by the process pool, then extract their parameters.
+        
+        Args:
+            read_futures: List of (report index, future resolving to the report content) pairs
             
         Returns:
-            Dictionary with added derived parameters
+            Dictionary mapping report index to its extracted parameters, or to the
+            exception that prevented extraction
         """
-        # Create a copy of the input parameters
-        result = params.copy()
+        outcomes: Dict[int, Any] = {}
+        reports = []
+        for index, future in read_futures:
+            try:
+                reports.append((index, future.result()))
+            except Exception as e:
+                outcomes[index] = e
+        
+        if reports:
+            extracted = self.extract_parameters_batch(reports)
+            for index, _ in reports:
+                outcomes[index] = extracted.get(index, ValueError("no parameters were extracted"))
+        return outcomes
+    
+    async def _read_and_extract_async(self, client: "httpx.AsyncClient", process_pool: ProcessPoolExecutor,
+                                      report_file: str) -> Dict[str, Any]:
+        """
+        Read a report in the process pool, then extract its parameters asynchronously.
+        
+        Args:
+            client: Shared httpx client used for the request
+            process_pool: Pool of PDF reading workers
+            report_file: Path to the ANSYS report PDF file
+            
+        Returns:
+            Dictionary of extracted parameters
+        """
+        loop = asyncio.get_running_loop()
+        report_content = await loop.run_in_executor(process_pool, _process_one, report_file, MAX_REPORT_CHARS)
+        return await self.extract_parameters_async(client, report_content)
+    
+    def calculate_derived_parameters(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate derived parameters for a batch of rows as column operations.
+        
+        Args:
+            rows: DataFrame of extracted parameters, one row per bridge
+            
+        Returns:
+            The same DataFrame with the derived parameter columns filled in; a
+            derived value is 'N/A' when any of its inputs is missing
+        """
+        def numeric_column(column: str) -> pd.Series:
+            # Missing or non-numeric values ('N/A', null, lists, objects) become NaN
+            # and propagate through the formulas. pd.to_numeric is not used because
+            # it raises on container values even with errors='coerce'.
+            return rows[column].map(_to_float).astype(float)
+        
+        def derived_column(values: pd.Series) -> pd.Series:
+            return values.round(5).astype(object).where(values.notna(), 'N/A')
         
         # Extract required values for calculations
-        applied_force = float(params.get('Applied Force (N)', 0))
-        max_deformation = 0
-        if params.get('Min/Max Deformation (m)'):
-            if isinstance(params['Min/Max Deformation (m)'], list):
-                max_deformation = abs(float(params['Min/Max Deformation (m)'][1]))
-            else:
-                # Try to parse string representation like "[0.0, 0.00637]"
-                deformation_str = params['Min/Max Deformation (m)']
-                match = re.search(r'\[(.*?), (.*?)\]', str(deformation_str))
-                if match:
-                    max_deformation = abs(float(match.group(2)))
+        applied_force = numeric_column('Applied Force (N)').abs()
+        max_deformation = rows['Min/Max Deformation (m)'].map(_extract_max_deformation).astype(float)
         
-        max_equiv_stress = float(params.get('Max Equivalent Stress (Pa)', 0))
-        tensile_yield = float(params.get('Tensile Yield Strength (Pa)', 0))
-        strain_energy = float(params.get('Strain Energy (J)', 0))
+        max_equiv_stress = numeric_column('Max Equivalent Stress (Pa)')
+        tensile_yield = numeric_column('Tensile Yield Strength (Pa)')
+        strain_energy = numeric_column('Strain Energy (J)')
         
         # Calculate derived parameters
         # Work Done (J) = 0.5 * |Applied Force| * Max Deformation
-        work_done = 0.5 * abs(applied_force) * max_deformation
-        result['Work Done (J)'] = round(work_done, 5)
+        work_done = 0.5 * applied_force * max_deformation
+        rows['Work Done (J)'] = derived_column(work_done)
         
         # Energy Residual (J) = |Strain Energy - Work Done|
-        energy_residual = abs(strain_energy - work_done)
-        result['Energy Residual (J)'] = round(energy_residual, 5)
+        rows['Energy Residual (J)'] = derived_column((strain_energy - work_done).abs())
         
         # Yield Constraint Residual = ReLU(Max Equivalent Stress - Tensile Yield Strength)
-        yield_constraint = max(0, max_equiv_stress - tensile_yield)
-        result['Yield Constraint Residual'] = round(yield_constraint, 5)
+        rows['Yield Constraint Residual'] = derived_column((max_equiv_stress - tensile_yield).clip(lower=0))
         
         # Max Failure Load (kg) = Applied Force (N) / 9.8
-        max_failure_load = abs(applied_force) / 9.8
-        result['Max Failure Load (kg)'] = round(max_failure_load, 5)
+        # Note: Despite column name confusion, this is kg
+        rows['Max Failure Load (N)'] = derived_column(applied_force / 9.8)
         
-        return result
+        return rows
     
     def update_excel_with_parameters(self, params: Dict[str, Any], bridge_id: int):
         """
@@ -228,57 +832,24 @@ class ANSYSReportExtractor:
             params: Dictionary containing parameters
             bridge_id: ID of the bridge to use in the DataFrame
         """
-        # Map of parameter names to column names
-        param_to_column = {
-            'Bridge Length (m)': 'Bridge Length (m)',
-            'Bridge Width (m)': 'Bridge Width (m)',
-            'Bridge Height (m)': 'Bridge Height (m)',
-            'Cross-Sectional Diameter (m)': 'Cross-Sectional Diameter (m)',
-            'Cross-Sectional Area (m²)': 'Cross-Sectional Area (m²)',
-            'Cross-Sectional Moment of Inertia (m⁴)': 'Cross-Sectional Moment of Inertia (m⁴)',
-            'Number of Strands': 'Number of Strands',
-            'Number of Beams': 'Number of Beams',
-            'Angle of Inclination (°)': 'Angle of Inclination (°)',
-            'Angle of Declination (°)': 'Angle of Declination (°)',
-            'Young\'s Modulus (Pa)': 'Young\'s Modulus (Pa)',
-            'Poisson\'s Ratio': 'Poisson\'s Ratio',
-            'Density (kg/m³)': 'Density (kg/m³)',
-            'Tensile Yield Strength (Pa)': 'Tensile Yield Strength (Pa)',
-            'Shear Modulus (Pa)': 'Shear Modulus (Pa)',
-            'Applied Force (N)': 'Applied Force (N)',
-            'Mesh Elements': 'Mesh Elements',
-            'Mesh Density (elements/m³)': 'Mesh Density (elements/m³)',
-            'Max Equivalent Stress (Pa)': 'Max Equivalent Stress (Pa)',
-            'Max Principal Stress (Pa)': 'Max Principal Stress (Pa)',
-            'Min/Max Deformation (m)': 'Min/Max Deformation (m)',
-            'Safety Factor': 'Safety Factor',
-            'Reaction Forces (N)': 'Reaction Forces (N)',
-            'Strain Energy (J)': 'Strain Energy (J)',
-            'Work Done (J)': 'Work Done (J)',
-            'Energy Residual (J)': 'Energy Residual (J)',
-            'Yield Constraint Residual': 'Yield Constraint Residual',
-            'Max Failure Load (kg)': 'Max Failure Load (N)'  # Note: Despite column name confusion, this is kg
-        }
-        
-        # Create a new row
+        # Create a new row, filling in values from parameters
         new_row = {'Bridge ID': bridge_id}
-        
-        # Fill in values from parameters
-        for param, column in param_to_column.items():
-            if param in params and params[param] is not None:
-                new_row[column] = params[param]
-            else:
-                new_row[column] = 'N/A'
+        new_row.update({
+            column: params[param] if params.get(param) is not None else 'N/A'
+            for param, column in self._PARAM_TO_COLUMN.items()
+        })
         
         # Set default values for categorical columns
-        new_row['Bridge Type'] = 'Truss'
-        new_row['Symmetry'] = 1
-        new_row['Joint Design'] = 'Bonded'
-        new_row['Load Type'] = 'Point'
-        new_row['Support Type'] = 'Fixed'
-        
-        # Add the row to the DataFrame
-        self.df = pd.concat([self.df, pd.DataFrame([new_row])], ignore_index=True)
+        new_row.update({
+            'Bridge Type': 'Truss',
+            'Symmetry': 1,
+            'Joint Design': 'Bonded',
+            'Load Type': 'Point',
+            'Support Type': 'Fixed',
+        })
+        
+        # Queue the row; all pending rows are added to the DataFrame in one go on save
+        self._pending_rows.append(new_row)
         logger.info(f"Added bridge with ID {bridge_id} to the DataFrame")
     
     def process_all_reports(self):
@@ -286,18 +857,91 @@ class ANSYSReportExtractor:
         report_files = self.find_ansys_reports()
         next_bridge_id = self.get_next_bridge_id()
         
-        for i, report_file in enumerate(report_files):
+        if not report_files:
+            self.save_excel()
+            return
+        
+        # PDF parsing is CPU-bound, so read the reports in parallel worker processes.
+        # API calls are network-bound, so batches of reports are sent from a thread
+        # pool; each thread waits for its reports' text and then calls the API.
+        # Results are consumed in report order so Bridge IDs stay deterministic.
+        batches = [list(range(start, min(start + self.batch_size, len(report_files))))
+                   for start in range(0, len(report_files), self.batch_size)]
+        max_workers = min(self.num_workers, len(report_files))
+        api_workers = min(API_MAX_WORKERS, len(batches))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as process_pool, \
+                ThreadPoolExecutor(max_workers=api_workers) as thread_pool:
+            read_futures = [process_pool.submit(_process_one, report_file, MAX_REPORT_CHARS)
+                            for report_file in report_files]
+            batch_futures = [thread_pool.submit(self._read_and_extract_batch,
+                                                [(i, read_futures[i]) for i in batch])
+                             for batch in batches]
+            
+            for batch, batch_future in zip(batches, batch_futures):
+                try:
+                    outcomes = batch_future.result()
+                except Exception as e:
+                    outcomes = {i: e for i in batch}
+                
+                for i in batch:
+                    report_file = report_files[i]
+                    try:
+                        logger.info(f"Processing report {i+1}/{len(report_files)}: {report_file}")
+                        
+                        # Read report content and extract parameters
+                        params = outcomes[i]
+                        if isinstance(params, Exception):
+                            raise params
+                        
+                        # Update Excel with the parameters
+                        self.update_excel_with_parameters(params, next_bridge_id)
+                        
+                        # Increment bridge ID
+                        next_bridge_id += 1
+                        
+                    except Exception as e:
+                        logger.error(f"Error processing report {report_file}: {e}")
+                        continue
+        
+        # Save the updated Excel file
+        self.save_excel()
+    
+    async def process_all_reports_async(self):
+        """
+        Process all ANSYS reports with one asynchronous API request per report and update the Excel file.
+        
+        Suited to large report sets: up to ASYNC_MAX_CONNECTIONS requests are in flight
+        at once, multiplexed over shared HTTP/2 connections when the h2 package is installed.
+        """
+        import httpx
+        
+        report_files = self.find_ansys_reports()
+        next_bridge_id = self.get_next_bridge_id()
+        
+        if not report_files:
+            self.save_excel()
+            return
+        
+        # The pool timeout is disabled so requests queue for a free connection
+        # instead of failing when more than ASYNC_MAX_CONNECTIONS are pending
+        http2 = importlib.util.find_spec('h2') is not None
+        limits = httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS)
+        timeout = httpx.Timeout(API_TIMEOUT[1], connect=API_TIMEOUT[0], pool=None)
+        max_workers = min(self.num_workers, len(report_files))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as process_pool:
+            async with httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout) as client:
+                outcomes = await asyncio.gather(
+                    *[self._read_and_extract_async(client, process_pool, report_file) for report_file in report_files],
+                    return_exceptions=True
+                )
+        
+        # Results are added in report order so Bridge IDs stay deterministic
+        for i, (report_file, params) in enumerate(zip(report_files, outcomes)):
             try:
                 logger.info(f"Processing report {i+1}/{len(report_files)}: {report_file}")
                 
-                # Read report content
-                report_content = self.read_report_file(report_file)
-                
-                # Extract parameters
-                params = self.extract_parameters(report_content)
-                
-                # Calculate derived parameters
-                params = self.calculate_derived_parameters(params)
+                if isinstance(params, BaseException):
+                    raise params
                 
                 # Update Excel with the parameters
                 self.update_excel_with_parameters(params, next_bridge_id)
@@ -319,6 +963,9 @@ class ANSYSReportExtractor:
         Returns:
             Next available Bridge ID
         """
+        # Rows queued since the last save are not in self.df yet
+        if self._pending_rows:
+            return self._pending_rows[-1]['Bridge ID'] + 1
         if self.df.empty:
             return 0
         return self.df['Bridge ID'].max() + 1
@@ -326,11 +973,39 @@ class ANSYSReportExtractor:
     def save_excel(self):
         """Save the DataFrame to Excel."""
         try:
-            self.df.to_excel(self.output_path, index=False)
+            if self._pending_rows:
+                # Derived parameters are computed for all new rows at once
+                new_rows = self.calculate_derived_parameters(pd.DataFrame(self._pending_rows))
+                self.df = pd.concat([self.df, new_rows], ignore_index=True)
+                self._pending_rows = []
+                self._compact_dtypes()
+            
+            # Stream rows through a write-only workbook; this skips the per-cell
+            # styling work that makes DataFrame.to_excel slow
+            from openpyxl import Workbook
+            
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet('Sheet1')
+            worksheet.append([str(column) for column in self.df.columns])
+            for row in self.df.itertuples(index=False, name=None):
+                worksheet.append([_excel_value(value) for value in row])
+            workbook.save(self.output_path)
             logger.info(f"Successfully saved Excel file to {self.output_path}")
         except Exception as e:
             logger.error(f"Error saving Excel file: {e}")
             raise
+    
+    def _compact_dtypes(self):
+        """Store the fixed categorical columns as categories and Symmetry as int8 to save memory."""
+        dtypes = {column: 'category' for column in self._CATEGORICAL_COLUMNS if column in self.df.columns}
+        self.df = self.df.astype(dtypes)
+        
+        if 'Symmetry' in self.df.columns:
+            try:
+                self.df['Symmetry'] = self.df['Symmetry'].astype('int8')
+            except (TypeError, ValueError):
+                # Missing or non-numeric values in the template; keep the column as is
+                pass
 
 def main():
     """Main function to run the script."""
@@ -339,6 +1014,10 @@ def main():
     parser.add_argument('--excel_template', required=True, help='Path to Excel template file')
     parser.add_argument('--reports_dir', required=True, help='Directory containing ANSYS report PDFs')
     parser.add_argument('--output', required=True, help='Path to save the output Excel file')
+    parser.add_argument('--num_workers', type=int, default=None, help='Number of worker processes used to read PDFs')
+    parser.add_argument('--batch_size', type=int, default=API_BATCH_SIZE, help='Number of reports sent to the API per request')
+    parser.add_argument('--use_async', action='store_true',
+                        help='Send one asynchronous API request per report with httpx instead of batched threaded requests')
     
     args = parser.parse_args()
     
@@ -346,10 +1025,15 @@ def main():
         api_key=args.api_key,
         excel_template_path=args.excel_template,
         reports_dir=args.reports_dir,
-        output_path=args.output
+        output_path=args.output,
+        num_workers=args.num_workers,
+        batch_size=args.batch_size
     )
     
-    extractor.process_all_reports()
+    if args.use_async:
+        asyncio.run(extractor.process_all_reports_async())
+    else:
+        extractor.process_all_reports()
     
     logger.info("Extraction process completed successfully!")
 
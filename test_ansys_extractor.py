@@ -1,4 +1,6 @@
 import os
+import re
+import json
 import pandas as pd
 from ansys_report_extractor import ANSYSReportExtractor
 import tempfile
@@ -7,11 +9,12 @@ from reportlab.pdfgen import canvas
 from io import BytesIO
 
 # Create a sample ANSYS report as PDF
-def create_sample_pdf_report(filepath):
+def create_sample_pdf_report(filepath, report_number=0):
     """Create a sample ANSYS report PDF file."""
-    sample_content = """
+    sample_content = f"""
     ANSYS Mechanical Analysis Report
     ===============================
+    Report Number: {report_number}
     
     Model Information:
     -----------------
@@ -111,14 +114,18 @@ def test_extractor(api_key):
     report_paths = []
     for i in range(2):
         report_path = os.path.join(test_dir, f'sample_report_{i}.pdf')
-        create_sample_pdf_report(report_path)
+        create_sample_pdf_report(report_path, i)
         report_paths.append(report_path)
     
     # Create test Excel template
     excel_template = create_test_excel()
     
-    # Create output path
-    output_path = os.path.join(tempfile.gettempdir(), 'test_output.xlsx')
+    # Create output path in a fresh directory so no cached API responses are reused
+    output_dir = os.path.join(tempfile.gettempdir(), 'test_ansys_output')
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    output_path = os.path.join(output_dir, 'test_output.xlsx')
     
     # Create extractor and process reports
     extractor = ANSYSReportExtractor(
@@ -128,8 +135,8 @@ def test_extractor(api_key):
         output_path=output_path
     )
     
-    # Mock the extract_parameters method to avoid actual API calls
-    def mock_extract(self, report_content):
+    # Parameters the mocked API returns for every report
+    def sample_params():
         return {
             'Bridge Length (m)': 1.016,
             'Bridge Width (m)': 0.254,
@@ -157,22 +164,102 @@ def test_extractor(api_key):
             'Strain Energy (J)': 4.82
         }
     
+    api_calls = []
+    
+    # Mock the API call to avoid actual requests. Batch replies answer only the first
+    # report and include a malformed entry, so the remaining reports must fall back
+    # to single-report requests.
+    def mock_call_api(self, prompt, max_tokens=None):
+        report_ids = [int(report_id) for report_id in re.findall(r'===REPORT (\d+)===', prompt)]
+        if report_ids:
+            api_calls.append('batch')
+            return json.dumps({'reports': [
+                {'id': report_ids[0], 'params': sample_params()},
+                {'id': 'not-a-report-id'},
+            ]})
+        api_calls.append('single')
+        return json.dumps(sample_params())
+    
     # Replace the method with our mock
     import types
-    extractor.extract_parameters = types.MethodType(mock_extract, extractor)
+    extractor._call_api = types.MethodType(mock_call_api, extractor)
     
     # Process the reports
     extractor.process_all_reports()
     
+    # One batch request, then one fallback request for the report missing from its reply
+    assert api_calls == ['batch', 'single'], api_calls
+    output_df = pd.read_excel(output_path)
+    assert len(output_df) == 3, len(output_df)
+    assert list(output_df['Bridge ID']) == [0, 1, 2]
+    
     print(f"Test completed successfully! Output saved to {output_path}")
     
     # Clean up
     shutil.rmtree(test_dir)
     os.remove(excel_template)
+    if os.path.exists(excel_template + '.parquet'):
+        os.remove(excel_template + '.parquet')
     
     return output_path
 
+# Unparseable deformation values from the model become NaN instead of raising
+def test_extract_max_deformation():
+    from ansys_report_extractor import _extract_max_deformation
+    
+    assert _extract_max_deformation('[0.0, -0.00637]') == 0.00637
+    assert _extract_max_deformation([0.0, 0.00637]) == 0.00637
+    # Valid literals that fail at runtime with TypeError: unhashable type
+    assert pd.isna(_extract_max_deformation('{[0]: 1}'))
+    assert pd.isna(_extract_max_deformation('{{1}}'))
+    assert pd.isna(_extract_max_deformation('N/A'))
+
+# One row with garbage inputs must not stop the other rows from being saved
+def test_save_excel_with_garbage_row():
+    excel_template = create_test_excel()
+    output_dir = os.path.join(tempfile.gettempdir(), 'test_ansys_garbage_output')
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    output_path = os.path.join(output_dir, 'test_output.xlsx')
+    
+    extractor = ANSYSReportExtractor(
+        api_key='unused',
+        excel_template_path=excel_template,
+        reports_dir=output_dir,
+        output_path=output_path
+    )
+    extractor.update_excel_with_parameters({
+        'Applied Force (N)': -1703,
+        'Min/Max Deformation (m)': [0.0, 0.00637],
+        'Strain Energy (J)': 4.82,
+        'Max Equivalent Stress (Pa)': 6.25E+06,
+        'Tensile Yield Strength (Pa)': 9.50E+06,
+    }, 1)
+    extractor.update_excel_with_parameters({
+        'Applied Force (N)': [1, 2],
+        'Min/Max Deformation (m)': '{[0]: 1}',
+        'Strain Energy (J)': {'value': 4.82},
+        'Max Equivalent Stress (Pa)': 'high',
+        'Tensile Yield Strength (Pa)': None,
+    }, 2)
+    extractor.save_excel()
+    
+    output_df = pd.read_excel(output_path)
+    assert list(output_df['Bridge ID']) == [0, 1, 2]
+    assert abs(output_df['Work Done (J)'].iloc[1] - 0.5 * 1703 * 0.00637) < 1e-4
+    assert output_df['Work Done (J)'].iloc[2] == 'N/A'
+    assert output_df['Max Failure Load (N)'].iloc[2] == 'N/A'
+    
+    # Clean up
+    shutil.rmtree(output_dir)
+    os.remove(excel_template)
+    if os.path.exists(excel_template + '.parquet'):
+        os.remove(excel_template + '.parquet')
+
 if __name__ == "__main__":
+    test_extract_max_deformation()
+    test_save_excel_with_garbage_row()
     # Replace with your actual OpenRouter API key
     api_key = "your_openrouter_api_key_here"
     output_file = test_extractor(api_key)